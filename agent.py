@@ -3,23 +3,134 @@ AI Team Communications Agent
 Implements Strands agent for intelligent communication planning and draft generation
 """
 
+import asyncio
+import atexit
+import bisect
+import concurrent.futures
+import functools
+import hashlib
+import itertools
 import json
+import operator
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import uuid
-from pydantic import BaseModel, Field
-
-# Import Strands SDK
-from strands import Agent, tool
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Annotated, Dict, List, Any, Optional, Tuple, Union
+from secrets import token_hex
+import diskcache
+from pydantic import AfterValidator, BaseModel, Field
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+# The Strands SDK is imported on first use (see _create_agent) so that the
+# pure data functions don't pay its import cost
+if TYPE_CHECKING:
+    from strands import Agent
 
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "data", "projects.json")
 
+# Projects are kept in DATA_FILE unless STORAGE_BACKEND=sqlite, in which case
+# they live in DATABASE_FILE (seeded from DATA_FILE when it is first created)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json").lower()
+DATABASE_FILE = os.path.join(os.path.dirname(__file__), "data", "projects.db")
+
+# Each thread keeps its own database connection
+_sqlite_local = threading.local()
+
+# Serializes writers so concurrent saves don't share the temporary file
+_SAVE_LOCK = threading.Lock()
+
+# Data directories already created, so saves skip the makedirs call
+_data_dirs = set()
+
+# Deferred changes are written to disk at most this many seconds after they are made
+FLUSH_DELAY = 2.0
+
+# Write-behind state: the (data, projects by id) awaiting a flush, which reads
+# are served from until it is on disk, and the timer that will flush it
+_pending: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]] = None
+_flush_timer: Optional[threading.Timer] = None
+_flush_lock = threading.Lock()
+
+# Bumped on every in-memory change, so derived caches notice unflushed edits
+_generation = 0
+
+# (file stamp, parsed data, projects by id) of the last read or write
+_projects_cache: Tuple = (None, None, None)
+
+_NL = "\n"
+
+# Transient ids (drafts) only need to be unique within this process
+_ID_PREFIX = f"{int(time.time()):x}-{os.getpid():x}"
+_ID_COUNTER = itertools.count()
+
+# Plans and drafts are cached on disk keyed on the project state that fed them
+LLM_CACHE_DIR = os.path.join(os.path.dirname(DATA_FILE), ".llm_cache")
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+BEDROCK_MODEL_ID = os.environ.get(
+    "BEDROCK_MODEL_ID", "eu.anthropic.claude-sonnet-4-20250514-v1:0"
+)
+
+# Models that accept outputConfig.textFormat (native structured outputs),
+# without the cross-region inference prefix; other models get structured
+# output through a forced tool call
+BEDROCK_STRUCTURED_OUTPUT_SUPPORTED_MODELS = frozenset(
+    {
+        "anthropic.claude-sonnet-4-5-20250929-v1:0",
+        "anthropic.claude-haiku-4-5-20251001-v1:0",
+        "anthropic.claude-opus-4-1-20250805-v1:0",
+        "anthropic.claude-opus-4-5-20251101-v1:0",
+    }
+)
+
+# Latency-optimized inference is only offered for some models and regions,
+# so it is opt-in: set BEDROCK_LATENCY_OPTIMIZED=1 where it is available
+BEDROCK_LATENCY_OPTIMIZED = os.environ.get("BEDROCK_LATENCY_OPTIMIZED") == "1"
+
+# Drafts for all audiences of a communication are requested in one call;
+# set EMAIL_DRAFTS_PARALLEL=1 to request one draft per audience concurrently
+EMAIL_DRAFTS_PARALLEL = os.environ.get("EMAIL_DRAFTS_PARALLEL") == "1"
+
+# Maximum number of audience drafts requested from Bedrock at the same time
+DRAFT_CONCURRENCY = 3
+
+# Output token caps: each audience's word limit from AUDIENCE_GUIDELINES plus
+# room for the subject, key points and JSON; batched calls get the sum
+DRAFT_MAX_TOKENS = MappingProxyType(
+    {"users": 500, "developers": 700, "management": 600}
+)
+DEFAULT_DRAFT_MAX_TOKENS = 700
+PLAN_MAX_TOKENS = 2000
+
+# Maximum number of planned communications drafted at the same time
+BATCH_CONCURRENCY = 4
+
 
 # Pydantic models for structured outputs
 
 
+def _trimmed_list(item_type: Any, limit: int) -> Any:
+    """
+    List type whose JSON schema asks for at most limit items.
+
+    Longer lists are trimmed after validation rather than rejected, so a
+    reply that runs slightly long is kept instead of discarded.
+    """
+    return Annotated[
+        List[item_type],
+        Field(json_schema_extra={"maxItems": limit}),
+        AfterValidator(lambda items: items[:limit]),
+    ]
+
+
 class PlannedCommunication(BaseModel):
     """Model for a single planned communication"""
 
@@ -31,7 +142,7 @@ class PlannedCommunication(BaseModel):
         description="List of audiences: users, developers, management"
     )
     reason: str = Field(description="Justification for this communication")
-    key_topics: List[str] = Field(description="Key topics to cover")
+    key_topics: _trimmed_list(str, 6) = Field(description="Key topics to cover")
     status: str = Field(
         default="pending", description="Status: pending, sent, or cancelled"
     )
@@ -42,7 +153,7 @@ class CommsPlan(BaseModel):
 
     generated_date: str = Field(description="Date plan was generated")
     planning_horizon: str = Field(description="Planning horizon (e.g., '3 months')")
-    planned_communications: List[PlannedCommunication] = Field(
+    planned_communications: _trimmed_list(PlannedCommunication, 12) = Field(
         description="List of planned communications"
     )
 
@@ -51,42 +162,488 @@ class EmailDraft(BaseModel):
     """Model for email draft"""
 
     subject: str = Field(description="Email subject line")
-    body: str = Field(description="Email body content")
+    # The length is only asked for: the prompt's word limits and the token
+    # budget keep bodies short, and a long one is better than none
+    body: str = Field(
+        description="Email body content", json_schema_extra={"maxLength": 2400}
+    )
     key_points: List[str] = Field(description="Key points covered in the email")
 
 
+class EmailDraftWithAudience(EmailDraft):
+    """Model for an email draft written for a named audience"""
+
+    audience: str = Field(description="Audience: users, developers, or management")
+
+
+class EmailDraftBatch(BaseModel):
+    """Model for the email drafts of every audience of one communication"""
+
+    drafts: _trimmed_list(EmailDraftWithAudience, 3) = Field(
+        description="One email draft per target audience"
+    )
+
+
+class InitialDrafts(EmailDraftBatch):
+    """Model for the email drafts of a plan's first communication"""
+
+    target_date: str = Field(
+        description="Target date of the communication drafted, in YYYY-MM-DD format"
+    )
+    type: str = Field(description="Type of the communication drafted")
+
+
+class PlanWithInitialDrafts(BaseModel):
+    """Model for a communications plan with drafts for its first communication"""
+
+    plan: CommsPlan = Field(description="The communications plan")
+    initial_drafts: InitialDrafts = Field(
+        description="Email drafts for the earliest planned communication"
+    )
+
+
 # Data access functions
 
 
+def _json_loads(raw: Union[str, bytes]) -> Any:
+    """Parse JSON text, using orjson when it is installed"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _json_dumps_pretty(data: Any) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _new_id() -> str:
+    """Return an id that is unique for the lifetime of this process"""
+    return f"{_ID_PREFIX}-{next(_ID_COUNTER):x}"
+
+
+def _singleton(factory):
+    """
+    Build a no-argument factory's value on first call and reuse it.
+
+    Unlike functools.lru_cache, concurrent first calls from worker threads
+    wait for one build instead of each constructing their own.
+    """
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
+
+
+def _sqlite_connection() -> sqlite3.Connection:
+    """Return this thread's connection to the projects database"""
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        data_dir = os.path.dirname(DATABASE_FILE)
+        if data_dir not in _data_dirs:
+            os.makedirs(data_dir, exist_ok=True)
+            _data_dirs.add(data_dir)
+        # Transactions are managed explicitly, see _sqlite_save
+        conn = sqlite3.connect(DATABASE_FILE, isolation_level=None)
+        # WAL lets readers carry on while a save is being committed
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS projects"
+            " (id TEXT PRIMARY KEY, position INTEGER NOT NULL, doc BLOB NOT NULL)"
+        )
+        _sqlite_local.conn = conn
+        if not _sqlite_version(conn) and os.path.exists(DATA_FILE):
+            with open(DATA_FILE, "rb") as f:
+                _sqlite_save(conn, _json_loads(f.read()), seed=True)
+    return conn
+
+
+def _sqlite_version(conn: sqlite3.Connection) -> int:
+    """Number of saves made to the database, 0 if it has never been written"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _sqlite_save(
+    conn: sqlite3.Connection, data: Dict[str, Any], seed: bool = False
+) -> int:
+    """
+    Store data's projects in the database and return its new version.
+
+    Only projects whose JSON (or position) changed are written, all in one
+    transaction. With seed=True nothing is written if another connection
+    has already populated the database.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = _sqlite_version(conn)
+        if seed and version:
+            conn.execute("ROLLBACK")
+            return version
+
+        stored = {
+            project_id: (position, doc)
+            for project_id, position, doc in conn.execute(
+                "SELECT id, position, doc FROM projects"
+            )
+        }
+        changed = []
+        for position, project in enumerate(data.get("projects", [])):
+            row = (position, _json_dumps(project))
+            if stored.pop(project["id"], None) != row:
+                changed.append((project["id"], *row))
+
+        if changed or stored:
+            conn.executemany(
+                "INSERT INTO projects (id, position, doc) VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE"
+                " SET position = excluded.position, doc = excluded.doc",
+                changed,
+            )
+            conn.executemany(
+                "DELETE FROM projects WHERE id = ?",
+                [(project_id,) for project_id in stored],
+            )
+            version += 1
+            # PRAGMA values can't be bound as parameters
+            conn.execute(f"PRAGMA user_version = {version:d}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return version
+
+
+def _read_projects(
+    stamp: Tuple[int, int],
+) -> Tuple[Tuple[int, int], Dict[str, Any]]:
+    """Read and parse the stored projects, returning them with their stamp"""
+    if STORAGE_BACKEND != "sqlite":
+        with open(DATA_FILE, "rb") as f:
+            raw = f.read()
+        return stamp, _json_loads(raw)
+
+    conn = _sqlite_connection()
+    # Read the version and the rows from the same snapshot
+    conn.execute("BEGIN")
+    try:
+        version = _sqlite_version(conn)
+        rows = conn.execute("SELECT doc FROM projects ORDER BY position").fetchall()
+    finally:
+        conn.execute("COMMIT")
+    return (version, 0), {"projects": [_json_loads(doc) for (doc,) in rows]}
+
+
+def _data_file_stamp() -> Optional[Tuple[int, int]]:
+    """
+    Return (mtime_ns, size) of the data file, or None if it does not exist.
+
+    With the SQLite backend this is (database version, 0) instead.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return _sqlite_version(_sqlite_connection()), 0
+    try:
+        stat = os.stat(DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cache_projects(
+    stamp: Optional[Tuple[int, int]], data: Optional[Dict[str, Any]]
+) -> None:
+    """Remember data as the contents of the data file at stamp"""
+    global _projects_cache
+    by_id = {p["id"]: p for p in data.get("projects", [])} if data else None
+    # Rebind in one step so readers never see a stamp with the wrong data
+    _projects_cache = (stamp, data, by_id)
+
+
+def _load_projects_indexed() -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Load projects along with an index of the same project dicts by id"""
+    # Unflushed changes are newer than the file, whatever has happened to it
+    pending = _pending
+    if pending is not None:
+        return pending
+
+    stamp = _data_file_stamp()
+    if stamp is None:
+        return {"projects": []}, {}
+
+    cached_stamp, data, by_id = _projects_cache
+    if stamp != cached_stamp:
+        _cache_projects(*_read_projects(stamp))
+        cached_stamp, data, by_id = _projects_cache
+
+        # Files from before last_comm_date was stored (or edited by hand)
+        # get it filled in once here and written back
+        if _refresh_last_comm_dates(data):
+            _mark_dirty(data)
+
+    return data, by_id
+
+
+def _last_comm_date(project: Dict[str, Any]) -> Optional[str]:
+    """Date of the latest entry in a project's communications history"""
+    comms_history = project.get("comms_history")
+    return comms_history[-1].get("date_sent", "N/A") if comms_history else None
+
+
+def _refresh_last_comm_dates(data: Dict[str, Any]) -> bool:
+    """Set each project's stored last_comm_date, returning whether any changed"""
+    changed = False
+    for project in data.get("projects", []):
+        last_comm_date = _last_comm_date(project)
+        if (
+            "last_comm_date" not in project
+            or project["last_comm_date"] != last_comm_date
+        ):
+            project["last_comm_date"] = last_comm_date
+            changed = True
+    return changed
+
+
 def load_projects() -> Dict[str, Any]:
-    """Load projects from JSON file"""
-    if not os.path.exists(DATA_FILE):
-        return {"projects": []}
+    """
+    Load projects from JSON file.
+
+    The parsed data is cached until the file changes on disk and is shared
+    between callers, so anything that mutates it must call save_projects
+    (or _mark_dirty to defer the write).
+    """
+    return _load_projects_indexed()[0]
+
+
+def data_version() -> Tuple[Optional[Tuple[int, int]], int]:
+    """Identify the current project data, including changes not yet flushed"""
+    return _data_file_stamp(), _generation
+
+
+def _write_projects(data: Dict[str, Any]) -> None:
+    """Atomically write projects to the JSON file (or the database)"""
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            with _SAVE_LOCK:
+                version = _sqlite_save(_sqlite_connection(), data)
+                _cache_projects((version, 0), data)
+        except BaseException:
+            _cache_projects(None, None)
+            raise
+        return
+
+    data_dir = os.path.dirname(DATA_FILE)
+    if data_dir not in _data_dirs:
+        os.makedirs(data_dir, exist_ok=True)
+        _data_dirs.add(data_dir)
+    tmp_file = DATA_FILE + ".tmp"
+    try:
+        # Serialize up front so the file gets one write instead of one per token
+        payload = _json_dumps_pretty(data)
+        with _SAVE_LOCK:
+            with open(tmp_file, "wb") as f:
+                f.write(payload)
+                # Make sure the data is on disk before the rename can be
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, DATA_FILE)
+            # data is now what's on disk, so keep serving it without a re-read
+            _cache_projects(_data_file_stamp(), data)
+    except BaseException:
+        # Fall back to whatever is on disk rather than unsaved changes
+        _cache_projects(None, None)
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
 
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
 
+def _cancel_flush() -> Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+    """Cancel the flush timer, returning the deferred write it was due to make"""
+    global _flush_timer
+    with _flush_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        return _pending
 
-def save_projects(data: Dict[str, Any]) -> None:
-    """Save projects to JSON file"""
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+
+def _clear_pending(
+    pending: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]],
+) -> None:
+    """Stop serving a deferred write once it is on disk, unless it has changed"""
+    global _pending
+    with _flush_lock:
+        if _pending is pending:
+            _pending = None
+
+
+def save_projects(data: Dict[str, Any], defer: bool = False) -> None:
+    """
+    Save projects to JSON file.
+
+    The data is written to a temporary file that then replaces the real one,
+    so a crash mid-write can never leave a truncated projects.json behind.
+    Any deferred write is superseded, since data holds the same changes.
+
+    With defer=True the write happens in the background up to FLUSH_DELAY
+    seconds later instead, so the caller doesn't wait on disk I/O.
+    """
+    if defer:
+        _mark_dirty(data)
+        return
+    pending = _cancel_flush()
+    _write_projects(data)
+    _clear_pending(pending)
+
+
+def _mark_dirty(data: Dict[str, Any]) -> None:
+    """
+    Record an in-memory change to projects and schedule it to be written.
+
+    Changes made in quick succession are coalesced into a single write
+    FLUSH_DELAY seconds after the first one. Until then load_projects
+    returns data itself, even if the file is missing or changes meanwhile.
+    """
+    global _pending, _flush_timer, _generation
+    # Index up front, since data may have gained projects the file hasn't
+    by_id = {p["id"]: p for p in data.get("projects", [])}
+    with _flush_lock:
+        _pending = (data, by_id)
+        _generation += 1
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(FLUSH_DELAY, flush_projects)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def flush_projects() -> None:
+    """Write any deferred project changes to the JSON file now"""
+    pending = _cancel_flush()
+    if pending is not None:
+        # Keep serving pending until written, so reads in between can't
+        # fall back to the file's older contents
+        _write_projects(pending[0])
+        _clear_pending(pending)
+
+
+# Don't lose deferred changes when the process exits normally
+atexit.register(flush_projects)
 
 
 def get_project_by_id(project_id: str) -> Optional[Dict[str, Any]]:
     """Get a specific project by ID"""
-    data = load_projects()
-    for project in data.get("projects", []):
-        if project["id"] == project_id:
-            return project
-    return None
+    return _load_projects_indexed()[1].get(project_id)
+
+
+def get_project_for_update(
+    project_id: str,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Get the projects data together with one project in it, for editing.
+
+    Both come from the same load, so changes made to the project are part
+    of the data passed to save_projects afterwards.
+    """
+    data, projects_by_id = _load_projects_indexed()
+    return data, projects_by_id.get(project_id)
+
+
+def _project_sections(project: Dict[str, Any]) -> Dict[str, Any]:
+    """Pre-joined context blocks for a project, reused until the project data changes"""
+    return _project_sections_cached(project["id"], data_version())
+
+
+@functools.lru_cache(maxsize=128)
+def _project_sections_cached(project_id: str, version: Tuple) -> Dict[str, Any]:
+    """Format the list-valued project fields used in prompts"""
+    project = get_project_by_id(project_id)
+    stakeholders = project["stakeholders"]
+
+    # Communications history grouped by audience, oldest first
+    by_audience = {}
+    for comm in project.get("comms_history", []):
+        by_audience.setdefault(comm.get("audience"), []).append(comm)
+
+    return {
+        "recent_updates": _NL.join(
+            "- " + update for update in project["recent_updates"]
+        ),
+        "milestones": _NL.join(
+            f"- {m['date']}: {m['description']}" for m in project["upcoming_milestones"]
+        ),
+        "stakeholders": _NL.join(
+            f"- {label}: {', '.join(stakeholders[key])}"
+            for key, label in (
+                ("users", "Users"),
+                ("developers", "Developers"),
+                ("management", "Management"),
+            )
+        ),
+        "history": _NL.join(
+            f"- {c['date_sent']} ({c['audience']}): {c['subject']}"
+            for c in project["comms_history"]
+        ),
+        # The most recent communications to each audience
+        "history_by_audience": {
+            audience: _NL.join(
+                f"- {c['date_sent']}: {c['subject']}" for c in comms[-3:]
+            )
+            for audience, comms in by_audience.items()
+        },
+    }
+
+
+@_singleton
+def _get_llm_cache() -> diskcache.Cache:
+    """Open the on-disk LLM response cache on first use"""
+    return diskcache.Cache(LLM_CACHE_DIR)
+
+
+def _llm_cache_key(output_model: type, prompt: str) -> Tuple[str, str]:
+    """
+    Build a cache key from everything sent in a structured output call.
+
+    That is the rendered prompt together with the system prompt, the model
+    and the output type, so a change to any of them (including the date in
+    a plan prompt) misses the cache.
+
+    agenerate_plan_and_drafts is the one exception: it stores its plan and
+    drafts under aliases, the keys of the plan prompt and single-draft
+    prompts that agenerate_comms_plan and agenerate_email_draft would send,
+    rather than under the combined prompt it actually sent.
+    """
+    payload = _json_dumps(
+        [BEDROCK_MODEL_ID, output_model.__name__, COMMS_AGENT_SYSTEM_PROMPT, prompt]
+    )
+    return output_model.__name__, hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _draft_cache_key(
+    project: Dict[str, Any], audience: str, planned_comm: Dict[str, Any]
+) -> Tuple[str, str]:
+    """Cache key for one audience's draft of a planned communication"""
+    return _llm_cache_key(EmailDraft, _draft_prompt(project, audience, planned_comm))
 
 
 # Tool functions for the agent
 
 
-@tool
 def get_project_context(project_id: str) -> str:
     """
     Get comprehensive project context for planning communications.
@@ -101,6 +658,13 @@ def get_project_context(project_id: str) -> str:
     if not project:
         return "ERROR: Project not found"
 
+    return _format_project_context(project)
+
+
+def _format_project_context(project: Dict[str, Any]) -> str:
+    """Format the full project details given to the model"""
+    sections = _project_sections(project)
+
     context = f"""
 Project: {project['name']}
 Status: {project['status']}
@@ -112,23 +676,20 @@ Business Value: {project['business_value']}
 Description: {project['description']}
 
 Recent Updates:
-{chr(10).join('- ' + update for update in project['recent_updates'])}
+{sections['recent_updates']}
 
 Upcoming Milestones:
-{chr(10).join(f"- {m['date']}: {m['description']}" for m in project['upcoming_milestones'])}
+{sections['milestones']}
 
 Stakeholders:
-- Users: {', '.join(project['stakeholders']['users'])}
-- Developers: {', '.join(project['stakeholders']['developers'])}
-- Management: {', '.join(project['stakeholders']['management'])}
+{sections['stakeholders']}
 
 Previous Communications:
-{chr(10).join(f"- {c['date_sent']} ({c['audience']}): {c['subject']}" for c in project['comms_history'])}
+{sections['history']}
     """
     return context.strip()
 
 
-@tool
 def save_communications_plan(project_id: str, plan_json: str) -> str:
     """
     Save a communications plan to a project.
@@ -141,16 +702,16 @@ def save_communications_plan(project_id: str, plan_json: str) -> str:
         Success or error message
     """
     try:
-        plan_data = json.loads(plan_json)
-        data = load_projects()
+        plan_data = _json_loads(plan_json)
+        data, projects_by_id = _load_projects_indexed()
 
-        for proj in data["projects"]:
-            if proj["id"] == project_id:
-                proj["comms_plan"] = plan_data
-                save_projects(data)
-                return f"SUCCESS: Communications plan saved for project {proj['name']}"
+        proj = projects_by_id.get(project_id)
+        if not proj:
+            return "ERROR: Project not found"
 
-        return "ERROR: Project not found"
+        proj["comms_plan"] = plan_data
+        _mark_dirty(data)
+        return f"SUCCESS: Communications plan saved for project {proj['name']}"
     except Exception as e:
         return f"ERROR: {str(e)}"
 
@@ -174,14 +735,407 @@ When generating communications plans:
 6. Justify each planned communication with clear reasoning
 """
 
-# Initialize the agent with tools
-comms_agent = Agent(
-    system_prompt=COMMS_AGENT_SYSTEM_PROMPT,
-    tools=[get_project_context, save_communications_plan],
-    model="eu.anthropic.claude-sonnet-4-20250514-v1:0",  # Bedrock model ID
+# Audience-specific instructions for draft prompts
+AUDIENCE_GUIDELINES = MappingProxyType(
+    {
+        "users": """
+    - Focus on benefits and user value
+    - Use accessible, non-technical language
+    - Keep it brief (under 200 words)
+    - Highlight what's in it for them
+    - Use friendly, engaging tone
+    """,
+        "developers": """
+    - Include technical details and architecture
+    - Mention integration points and APIs
+    - Discuss implementation specifics
+    - Keep under 300 words
+    - Use technical terminology appropriately
+    """,
+        "management": """
+    - Focus on metrics, ROI, and strategic value
+    - Mention risks and resource requirements
+    - Include timeline and budget status
+    - Keep under 250 words
+    - Professional, executive tone
+    """,
+    }
+)
+
+# Prompt for a communications plan
+PLAN_PROMPT_TEMPLATE = """
+Analyze this project and create a comprehensive 3-month communications plan.
+
+Project context:
+{context}
+
+Based on the project context:
+- Plan communications for the next 3 months starting from {today}
+- Specify target_date in YYYY-MM-DD format
+- Choose appropriate type: status_update, launch_announcement, new_features, or management_update
+- Select relevant audiences from: users, developers, management
+- Provide clear reason for each communication
+- List key topics to cover
+- Set status to "pending"
+
+Consider:
+- Project phase and timeline
+- Communication gaps (which audiences haven't been contacted recently)
+- Upcoming milestones
+- Appropriate cadence for each stakeholder group
+"""
+
+# Appended to the plan prompt when the first drafts are written in the same call
+PLAN_DRAFTS_PROMPT = """
+Then draft the first emails of the plan: for the earliest planned communication,
+write a separate email for each of its audiences, with its audience set to the
+exact audience name. Set the drafts' target_date and type to those of that
+communication.
+
+Requirements for each email:
+- Reference previous communications to that audience if relevant (maintain continuity)
+- Cover the key topics of the communication
+- Match the communication type
+- Be specific and actionable
+""" + "".join(
+    f"\nAudience Guidelines for {audience}:\n{guidelines}"
+    for audience, guidelines in AUDIENCE_GUIDELINES.items()
+)
+
+# Prompt for an email draft, split so that the project part can be shared by
+# the audiences drafted in one call
+EMAIL_PROMPT_TEMPLATE = """
+Write an email for this project communication.
+
+Project: {name}
+Current Phase: {current_phase}
+Status: {status}
+
+Communication Type: {type}
+Reason for Communication: {reason}
+Key Topics to Cover: {key_topics}
+
+Recent Project Updates:
+{recent_updates}
+
+Upcoming Milestones:
+{milestones}
+
+Additional Requirements:
+- Reference previous communications if relevant (maintain continuity)
+- Cover the key topics listed
+- Match the communication type ({type})
+- Be specific and actionable
+"""
+
+EMAIL_AUDIENCE_PROMPT_TEMPLATE = """
+Target Audience: {audience}
+
+Previous Communications to {audience}:
+{history}
+
+Audience Guidelines for {audience}:
+{guidelines}
+"""
+
+# Appended to the project prompt when every audience is drafted in one call
+EMAIL_BATCH_PROMPT_TEMPLATE = """
+Write a separate email for each of these target audiences: {audiences}
+Return one draft per audience, with its audience set to the exact name above.
+{audience_sections}"""
+
+
+def _plan_prompt(project: Dict[str, Any], today: str) -> str:
+    """Render the communications plan prompt for a project"""
+    return PLAN_PROMPT_TEMPLATE.format(
+        context=_format_project_context(project), today=today
+    )
+
+
+def _email_project_prompt(project: Dict[str, Any], planned_comm: Dict[str, Any]) -> str:
+    """Render the part of a draft prompt shared by every audience"""
+    sections = _project_sections(project)
+    return EMAIL_PROMPT_TEMPLATE.format(
+        name=project["name"],
+        current_phase=project["current_phase"],
+        status=project["status"],
+        type=planned_comm["type"],
+        reason=planned_comm["reason"],
+        key_topics=", ".join(planned_comm.get("key_topics", [])),
+        recent_updates=sections["recent_updates"],
+        milestones=sections["milestones"],
+    )
+
+
+def _email_audience_prompt(project: Dict[str, Any], audience: str) -> str:
+    """Render the audience-specific part of a draft prompt"""
+    return EMAIL_AUDIENCE_PROMPT_TEMPLATE.format(
+        audience=audience,
+        guidelines=AUDIENCE_GUIDELINES.get(audience, ""),
+        history=_project_sections(project)["history_by_audience"].get(audience, ""),
+    )
+
+
+def _draft_prompt(
+    project: Dict[str, Any], audience: str, planned_comm: Dict[str, Any]
+) -> str:
+    """Render the prompt for one audience's draft of a planned communication"""
+    project_prompt = _email_project_prompt(project, planned_comm)
+    return project_prompt + _email_audience_prompt(project, audience)
+
+
+# Key topics for communications in the fallback plan
+_STATUS_UPDATE_TOPICS = ("Progress update", "Blockers", "Next steps")
+_MANAGEMENT_UPDATE_TOPICS = ("Progress", "Budget", "Risks", "Timeline")
+
+# Subject and body templates for drafts generated without the LLM
+FALLBACK_SUBJECT_TEMPLATES = MappingProxyType(
+    {
+        "users": "{name} Update - New Features & Improvements",
+        "developers": "{name} - Technical Update",
+        "management": "{name} Status Report",
+    }
+)
+
+FALLBACK_BODY_TEMPLATES = MappingProxyType(
+    {
+        "users": """
+Hi team,
+
+We wanted to share an update on {name}.
+
+Recent progress:
+{recent_updates}
+
+What's coming next:
+We're working on {current_phase} and expect to launch on {expected_launch}.
+
+Thanks for your continued support!
+    """,
+        "developers": """
+Team,
+
+Technical update on {name}:
+
+Current Phase: {current_phase}
+
+Recent Updates:
+{recent_updates}
+
+Upcoming Milestones:
+{milestones}
+
+Please review and let me know if you have questions.
+    """,
+        "management": """
+Executive Update: {name}
+
+Status: {status}
+Current Phase: {current_phase}
+Expected Launch: {expected_launch}
+
+Key Accomplishments:
+{recent_updates}
+
+Business Value: {business_value}
+
+Next Steps:
+{next_steps}
+    """,
+    }
 )
 
 
+@_singleton
+def _get_model():
+    """Create the shared Bedrock model; agents built on it reuse the same client"""
+    from strands.models import BedrockModel
+
+    additional_args = None
+    if BEDROCK_LATENCY_OPTIMIZED:
+        additional_args = {"performanceConfig": {"latency": "optimized"}}
+
+    return BedrockModel(model_id=BEDROCK_MODEL_ID, additional_args=additional_args)
+
+
+@functools.lru_cache(maxsize=None)
+def _agent_tools() -> tuple:
+    """Wrap the tool functions for the agent"""
+    from strands import tool
+
+    return tool(get_project_context), tool(save_communications_plan)
+
+
+def _create_agent() -> "Agent":
+    """Create a comms agent with its tools on the shared model"""
+    from strands import Agent
+
+    return Agent(
+        system_prompt=COMMS_AGENT_SYSTEM_PROMPT,
+        tools=list(_agent_tools()),
+        model=_get_model(),
+    )
+
+
+@_singleton
+def _get_agent() -> "Agent":
+    """Create the shared comms agent on first use"""
+    return _create_agent()
+
+
+def __getattr__(name: str) -> Any:
+    # comms_agent and comms_model are built on first access, not at import
+    if name == "comms_agent":
+        return _get_agent()
+    if name == "comms_model":
+        return _get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _native_structured_output() -> bool:
+    """Whether the configured model supports native structured outputs"""
+    return (
+        BEDROCK_MODEL_ID in BEDROCK_STRUCTURED_OUTPUT_SUPPORTED_MODELS
+        or BEDROCK_MODEL_ID.split(".", 1)[-1]
+        in BEDROCK_STRUCTURED_OUTPUT_SUPPORTED_MODELS
+    )
+
+
+# Length limits that constrained decoding doesn't take, restated in descriptions
+_LENGTH_LIMITS = {"maxLength": "at most {} characters", "maxItems": "at most {} items"}
+
+
+def _native_schema(schema: Any) -> Any:
+    """
+    Adapt a JSON schema for native structured outputs.
+
+    Every object is closed to additional properties, as constrained decoding
+    requires, and length limits move into the descriptions, since the
+    models trim over-long lists themselves.
+    """
+    if isinstance(schema, dict):
+        schema = {key: _native_schema(value) for key, value in schema.items()}
+        if schema.get("type") == "object":
+            schema["additionalProperties"] = False
+        for key, text in _LENGTH_LIMITS.items():
+            if isinstance(schema.get(key), int):
+                limit = text.format(schema.pop(key))
+                description = schema.get("description")
+                schema["description"] = (
+                    f"{description} ({limit})" if description else limit
+                )
+    elif isinstance(schema, list):
+        schema = [_native_schema(item) for item in schema]
+    return schema
+
+
+@functools.lru_cache(maxsize=None)
+def _output_config(output_model) -> Dict[str, Any]:
+    """The outputConfig that constrains a response to an output model's schema"""
+    schema = _native_schema(output_model.model_json_schema())
+    return {
+        "textFormat": {
+            "type": "json_schema",
+            "structure": {
+                "jsonSchema": {
+                    "schema": json.dumps(schema),
+                    "name": output_model.__name__,
+                    "description": (output_model.__doc__ or "").strip(),
+                }
+            },
+        }
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_config(output_model) -> Dict[str, Any]:
+    """A toolConfig that forces the model to answer with output_model's tool"""
+    from strands.tools import convert_pydantic_to_tool_spec
+
+    tool_spec = convert_pydantic_to_tool_spec(output_model)
+    return {
+        "tools": [{"toolSpec": tool_spec}],
+        "toolChoice": {"tool": {"name": tool_spec["name"]}},
+    }
+
+
+def _converse_structured(
+    output_model,
+    prompt: str,
+    max_tokens: Optional[int] = None,
+):
+    """
+    Make a single Converse request whose answer fills in output_model.
+
+    Native structured outputs constrain the reply to the model's JSON
+    schema; otherwise the reply is a forced call to a tool whose input is
+    the output model.
+    """
+    request = {
+        "modelId": BEDROCK_MODEL_ID,
+        "system": [{"text": COMMS_AGENT_SYSTEM_PROMPT}],
+        "messages": [{"role": "user", "content": [{"text": prompt}]}],
+    }
+    native = _native_structured_output()
+    if native:
+        request["outputConfig"] = _output_config(output_model)
+    else:
+        request["toolConfig"] = _tool_config(output_model)
+    if max_tokens:
+        request["inferenceConfig"] = {"maxTokens": max_tokens}
+    if BEDROCK_LATENCY_OPTIMIZED:
+        request["performanceConfig"] = {"latency": "optimized"}
+
+    # The shared model's client has the region and retry settings in use
+    response = _get_model().client.converse(**request)
+    content = response["output"]["message"]["content"]
+
+    if native:
+        return output_model.model_validate_json(
+            "".join(block.get("text", "") for block in content)
+        )
+
+    for block in content:
+        if "toolUse" in block:
+            return output_model.model_validate(block["toolUse"]["input"])
+    raise ValueError(f"No {output_model.__name__} in response: {content}")
+
+
+async def _astructured_output(
+    output_model,
+    prompt: str,
+    max_tokens: Optional[int] = None,
+):
+    """
+    Run a one-shot structured output call straight against Bedrock.
+
+    Plan and draft prompts carry all the context they need, so they skip
+    the agent loop and its conversation state and make one Converse request.
+    boto3 is synchronous, so the request runs on a worker thread and
+    concurrent calls don't block the event loop.
+    """
+    return await asyncio.to_thread(
+        _converse_structured, output_model, prompt, max_tokens
+    )
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    asyncio.run refuses to start inside a running event loop (for example
+    when an async caller uses a sync wrapper), so in that case the
+    coroutine gets its own loop on a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 # Main agent functions
 
 
@@ -189,55 +1143,56 @@ def generate_comms_plan(project_id: str) -> Dict[str, Any]:
     """
     Generate a 3-month communications plan for a project using structured output.
 
+    Synchronous wrapper around agenerate_comms_plan.
+
     Args:
         project_id: The project identifier
 
     Returns:
         Updated comms_plan object with planned communications
     """
-    project = get_project_by_id(project_id)
-    if not project:
-        return {"error": "Project not found"}
+    return _run_sync(agenerate_comms_plan(project_id))
 
-    today = datetime.now().strftime("%Y-%m-%d")
 
-    prompt = f"""
-Analyze this project and create a comprehensive 3-month communications plan.
+async def agenerate_comms_plan(project_id: str) -> Dict[str, Any]:
+    """
+    Generate a 3-month communications plan for a project using structured output.
 
-Use the get_project_context tool to retrieve full project details for project_id: {project_id}
+    Args:
+        project_id: The project identifier
 
-Based on the project context:
-- Plan communications for the next 3 months starting from {today}
-- Specify target_date in YYYY-MM-DD format
-- Choose appropriate type: status_update, launch_announcement, new_features, or management_update
-- Select relevant audiences from: users, developers, management
-- Provide clear reason for each communication
-- List key topics to cover
-- Set status to "pending"
+    Returns:
+        Updated comms_plan object with planned communications
+    """
+    project = get_project_by_id(project_id)
+    if not project:
+        return {"error": "Project not found"}
 
-Consider:
-- Project phase and timeline
-- Communication gaps (which audiences haven't been contacted recently)
-- Upcoming milestones
-- Appropriate cadence for each stakeholder group
-"""
+    today = date.today().isoformat()
+    prompt = _plan_prompt(project, today)
 
     try:
-        # Use structured output to get type-safe plan
-        plan = comms_agent.structured_output(CommsPlan, prompt)
-
-        # Convert to dict and update project
-        plan_data = plan.model_dump()
-        plan_data["generated_date"] = today
-        plan_data["planning_horizon"] = "3 months"
-
-        data = load_projects()
-        for proj in data["projects"]:
-            if proj["id"] == project_id:
-                proj["comms_plan"] = plan_data
-                break
+        # Reuse the last plan if its prompt hasn't changed
+        cache_key = _llm_cache_key(CommsPlan, prompt)
+        plan_data = _get_llm_cache().get(cache_key)
+
+        if plan_data is None:
+            # Use structured output to get type-safe plan
+            plan = await _astructured_output(
+                CommsPlan, prompt, max_tokens=PLAN_MAX_TOKENS
+            )
+
+            # Convert to dict and update project
+            plan_data = plan.model_dump()
+            plan_data["generated_date"] = today
+            plan_data["planning_horizon"] = "3 months"
+            _get_llm_cache().set(cache_key, plan_data, expire=LLM_CACHE_TTL)
+
+        data, projects_by_id = _load_projects_indexed()
+        if project_id in projects_by_id:
+            projects_by_id[project_id]["comms_plan"] = plan_data
+            _mark_dirty(data)
 
-        save_projects(data)
         return plan_data
 
     except Exception as e:
@@ -246,20 +1201,115 @@ Consider:
         return _generate_fallback_plan(project)
 
 
-def get_due_communications() -> List[Dict[str, Any]]:
+def _next_planned_comm(plan_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The earliest pending communication of a plan, preferring upcoming ones"""
+    today = date.today().isoformat()
+    pending = [
+        comm
+        for comm in plan_data.get("planned_communications", [])
+        if comm.get("status", "pending") == "pending"
+    ]
+    upcoming = [comm for comm in pending if comm["target_date"] >= today]
+    return min(upcoming or pending, key=lambda comm: comm["target_date"], default=None)
+
+
+def generate_plan_and_drafts(project_id: str) -> Dict[str, Any]:
     """
-    Find all communications due within the next 7 days.
+    Generate a communications plan and the drafts for its first communication.
+
+    Synchronous wrapper around agenerate_plan_and_drafts.
+
+    Args:
+        project_id: The project identifier
 
     Returns:
-        List of due communications with project context
+        Dict with the comms_plan and the drafts of its earliest communication
     """
-    data = load_projects()
-    today = datetime.now().date()
-    due_date = today + timedelta(days=7)
+    return _run_sync(agenerate_plan_and_drafts(project_id))
 
-    due_comms = []
 
-    for project in data.get("projects", []):
+async def agenerate_plan_and_drafts(project_id: str) -> Dict[str, Any]:
+    """
+    Generate a communications plan and the drafts for its first communication.
+
+    The plan and the drafts come from a single structured output call, which
+    saves the second round trip and prompt of planning and drafting
+    separately. The results go into the same caches as agenerate_comms_plan
+    and agenerate_email_draft, which then store and return them; anything
+    the call did not produce is generated by those functions as usual.
+
+    Args:
+        project_id: The project identifier
+
+    Returns:
+        Dict with the comms_plan and the drafts of its earliest communication
+    """
+    project = get_project_by_id(project_id)
+    if not project:
+        return {"error": "Project not found"}
+
+    today = date.today().isoformat()
+    cache = _get_llm_cache()
+    plan_prompt = _plan_prompt(project, today)
+    # Filled under the keys that agenerate_comms_plan and
+    # agenerate_email_draft look up, not under this call's own prompt
+    cache_key = _llm_cache_key(CommsPlan, plan_prompt)
+
+    try:
+        if cache.get(cache_key) is None:
+            result = await _astructured_output(
+                PlanWithInitialDrafts,
+                plan_prompt + PLAN_DRAFTS_PROMPT,
+                max_tokens=PLAN_MAX_TOKENS + sum(DRAFT_MAX_TOKENS.values()),
+            )
+
+            plan_data = result.plan.model_dump()
+            plan_data["generated_date"] = today
+            plan_data["planning_horizon"] = "3 months"
+            cache.set(cache_key, plan_data, expire=LLM_CACHE_TTL)
+
+            planned_comm = _next_planned_comm(plan_data)
+            initial_drafts = result.initial_drafts
+            # Only keep drafts written for the communication they'd be used for
+            drafted_for_next = (
+                planned_comm is not None
+                and initial_drafts.target_date == planned_comm["target_date"]
+                and initial_drafts.type == planned_comm["type"]
+            )
+            for draft in initial_drafts.drafts if drafted_for_next else ():
+                if draft.audience in planned_comm["audiences"]:
+                    cache.set(
+                        _draft_cache_key(project, draft.audience, planned_comm),
+                        draft.model_dump(exclude={"audience"}),
+                        expire=LLM_CACHE_TTL,
+                    )
+
+    except Exception as e:
+        print(f"Error generating plan and drafts: {e}")
+
+    plan_data = await agenerate_comms_plan(project_id)
+    planned_comm = _next_planned_comm(plan_data)
+    drafts = (
+        await agenerate_email_draft(project_id, planned_comm=planned_comm)
+        if planned_comm
+        else []
+    )
+
+    return {"comms_plan": plan_data, "drafts": drafts}
+
+
+@functools.lru_cache(maxsize=1)
+def _comms_schedule(version: Tuple) -> Tuple[List[int], List[Tuple]]:
+    """
+    Index pending planned communications by target date.
+
+    Returns a sorted list of target date ordinals and a parallel list of
+    (target_ordinal, project, planned_comm) entries, so a date window can be
+    found with bisect on plain ints instead of scanning every project.
+    """
+    entries = []
+
+    for project in load_projects().get("projects", []):
         comms_plan = project.get("comms_plan", {})
         planned = comms_plan.get("planned_communications", [])
 
@@ -268,22 +1318,54 @@ def get_due_communications() -> List[Dict[str, Any]]:
                 continue
 
             try:
-                target_date = datetime.strptime(comm["target_date"], "%Y-%m-%d").date()
-                if today <= target_date <= due_date:
-                    due_comms.append(
-                        {
-                            "project_id": project["id"],
-                            "project_name": project["name"],
-                            "planned_comm": comm,
-                            "days_until_due": (target_date - today).days,
-                        }
-                    )
+                target_date = date.fromisoformat(comm["target_date"])
             except (ValueError, KeyError) as e:
                 print(f"Error parsing date for communication: {e}")
                 continue
 
-    # Sort by due date
-    due_comms.sort(key=lambda x: x["days_until_due"])
+            entries.append((target_date.toordinal(), project, comm))
+
+    # Stable sort keeps project/plan order for communications due the same day
+    entries.sort(key=operator.itemgetter(0))
+
+    return [entry[0] for entry in entries], entries
+
+
+def get_due_communications(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Find all communications due within the next 7 days.
+
+    Args:
+        limit: Return at most this many of the soonest due (optional)
+
+    Returns:
+        List of due communications with project context, soonest first
+    """
+    today = date.today().toordinal()
+
+    dates, entries = _comms_schedule(data_version())
+    lo = bisect.bisect_left(dates, today)
+    hi = bisect.bisect_right(dates, today + 7)
+
+    due_comms = []
+
+    for target_ordinal, project, comm in entries[lo:hi]:
+        # The window is sorted, so the first matches are the most urgent
+        if len(due_comms) == limit:
+            break
+
+        # Sending marks a communication in place; skip any sent since indexing
+        if comm.get("status") != "pending":
+            continue
+
+        due_comms.append(
+            {
+                "project_id": project["id"],
+                "project_name": project["name"],
+                "planned_comm": comm,
+                "days_until_due": target_ordinal - today,
+            }
+        )
 
     return due_comms
 
@@ -295,6 +1377,8 @@ def generate_email_draft(
     Generate email drafts for a planned communication using structured output.
     Creates separate drafts for each audience.
 
+    Synchronous wrapper around agenerate_email_draft.
+
     Args:
         project_id: The project identifier
         planned_comm_id: Target date of planned communication (optional)
@@ -303,6 +1387,34 @@ def generate_email_draft(
     Returns:
         List of draft email objects (one per audience)
     """
+    return _run_sync(
+        agenerate_email_draft(
+            project_id, planned_comm_id=planned_comm_id, planned_comm=planned_comm
+        )
+    )
+
+
+async def agenerate_email_draft(
+    project_id: str,
+    planned_comm_id: str = None,
+    planned_comm: Dict[str, Any] = None,
+    max_concurrency: int = DRAFT_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Generate email drafts for a planned communication using structured output.
+    Drafts for all audiences are requested in a single call that shares the
+    project context; with EMAIL_DRAFTS_PARALLEL set they are requested
+    concurrently instead, one call per audience.
+
+    Args:
+        project_id: The project identifier
+        planned_comm_id: Target date of planned communication (optional)
+        planned_comm: The planned communication object (optional)
+        max_concurrency: Maximum number of in-flight LLM calls
+
+    Returns:
+        List of draft email objects (one per audience, in audience order)
+    """
     project = get_project_by_id(project_id)
     if not project:
         return [{"error": "Project not found"}]
@@ -317,99 +1429,162 @@ def generate_email_draft(
     if not planned_comm:
         return [{"error": "Planned communication not found"}]
 
-    drafts = []
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    # Audience-specific instructions
-    audience_guidelines = {
-        "users": """
-        - Focus on benefits and user value
-        - Use accessible, non-technical language
-        - Keep it brief (under 200 words)
-        - Highlight what's in it for them
-        - Use friendly, engaging tone
-        """,
-        "developers": """
-        - Include technical details and architecture
-        - Mention integration points and APIs
-        - Discuss implementation specifics
-        - Keep under 300 words
-        - Use technical terminology appropriately
-        """,
-        "management": """
-        - Focus on metrics, ROI, and strategic value
-        - Mention risks and resource requirements
-        - Include timeline and budget status
-        - Keep under 250 words
-        - Professional, executive tone
-        """,
-    }
+    def _finish(audience: str, draft_data: Dict[str, Any]) -> Dict[str, Any]:
+        draft_data["audience"] = audience
+        draft_data["project_id"] = project_id
+        draft_data["planned_comm_id"] = planned_comm_id or planned_comm.get(
+            "target_date"
+        )
+        draft_data["type"] = planned_comm["type"]
+        draft_data["draft_id"] = _new_id()
 
-    # Generate draft for each audience
-    for audience in planned_comm.get("audiences", []):
-        # Get communication history for this audience
-        audience_history = [
-            c for c in project.get("comms_history", []) if c.get("audience") == audience
-        ]
+        return draft_data
 
-        # Prepare context
-        context = f"""
-Project: {project['name']}
-Current Phase: {project['current_phase']}
-Status: {project['status']}
+    async def _draft_for(audience: str) -> Dict[str, Any]:
+        prompt = _draft_prompt(project, audience, planned_comm)
 
-Communication Type: {planned_comm['type']}
-Target Audience: {audience}
-Reason for Communication: {planned_comm['reason']}
-Key Topics to Cover: {', '.join(planned_comm.get('key_topics', []))}
+        try:
+            # Reuse an earlier draft made from the same prompt
+            cache_key = _llm_cache_key(EmailDraft, prompt)
+            draft_data = _get_llm_cache().get(cache_key)
+
+            if draft_data is None:
+                # Use structured output for type-safe email draft
+                async with semaphore:
+                    draft = await _astructured_output(
+                        EmailDraft,
+                        prompt,
+                        max_tokens=DRAFT_MAX_TOKENS.get(
+                            audience, DEFAULT_DRAFT_MAX_TOKENS
+                        ),
+                    )
 
-Recent Project Updates:
-{chr(10).join('- ' + update for update in project['recent_updates'])}
+                draft_data = draft.model_dump()
+                _get_llm_cache().set(cache_key, draft_data, expire=LLM_CACHE_TTL)
 
-Upcoming Milestones:
-{chr(10).join(f"- {m['date']}: {m['description']}" for m in project['upcoming_milestones'])}
+            return _finish(audience, draft_data)
 
-Previous Communications to {audience}:
-{chr(10).join(f"- {c['date_sent']}: {c['subject']}" for c in audience_history[-3:])}
-"""
+        except Exception as e:
+            print(f"Error generating draft for {audience}: {e}")
+            # Fallback draft
+            return _generate_fallback_draft(project, audience, planned_comm)
+
+    async def _drafts_batched(audiences: List[str]) -> List[Dict[str, Any]]:
+        cache = _get_llm_cache()
+        drafts = {}
+        for audience in audiences:
+            draft_data = cache.get(_draft_cache_key(project, audience, planned_comm))
+            if draft_data is not None:
+                drafts[audience] = _finish(audience, draft_data)
+
+        missing = [a for a in audiences if a not in drafts]
+        if len(missing) > 1:
+            audience_sections = "".join(
+                _email_audience_prompt(project, audience) for audience in missing
+            )
+            batch_prompt = EMAIL_BATCH_PROMPT_TEMPLATE.format(
+                audiences=", ".join(missing), audience_sections=audience_sections
+            )
+            prompt = _email_project_prompt(project, planned_comm) + batch_prompt
 
-        prompt = f"""
-Write an email for this project communication.
+            try:
+                # One structured output call for every audience still missing
+                async with semaphore:
+                    batch = await _astructured_output(
+                        EmailDraftBatch,
+                        prompt,
+                        max_tokens=sum(
+                            DRAFT_MAX_TOKENS.get(a, DEFAULT_DRAFT_MAX_TOKENS)
+                            for a in missing
+                        ),
+                    )
 
-{context}
+                for draft in batch.drafts:
+                    if draft.audience in missing and draft.audience not in drafts:
+                        draft_data = draft.model_dump(exclude={"audience"})
+                        cache.set(
+                            _draft_cache_key(project, draft.audience, planned_comm),
+                            draft_data,
+                            expire=LLM_CACHE_TTL,
+                        )
+                        drafts[draft.audience] = _finish(draft.audience, draft_data)
+
+            except Exception as e:
+                # One bad reply shouldn't cost every audience its draft, so
+                # they are retried on their own below
+                print(f"Error generating drafts for {', '.join(missing)}: {e}")
+
+        # Anything the batch left out (or failed on) is drafted on its own,
+        # falling back to a template only if that call fails too
+        missing = [a for a in audiences if a not in drafts]
+        for audience, draft_data in zip(
+            missing, await asyncio.gather(*map(_draft_for, missing))
+        ):
+            drafts[audience] = draft_data
+
+        return [drafts[audience] for audience in audiences]
+
+    audiences = planned_comm.get("audiences", [])
+    if EMAIL_DRAFTS_PARALLEL:
+        # Generate drafts for all audiences concurrently
+        return list(await asyncio.gather(*map(_draft_for, audiences)))
+
+    return await _drafts_batched(audiences)
+
+
+async def agenerate_drafts(
+    items: List[Dict[str, Any]], max_concurrency: int = BATCH_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Generate email drafts for several planned communications concurrently.
 
-Audience Guidelines for {audience}:
-{audience_guidelines.get(audience, '')}
+    Args:
+        items: Dicts with "project_id" and "planned_comm" keys
+        max_concurrency: Maximum number of communications drafted at once
 
-Additional Requirements:
-- Reference previous communications if relevant (maintain continuity)
-- Cover the key topics listed
-- Match the communication type ({planned_comm['type']})
-- Be specific and actionable
-"""
+    Returns:
+        Flat list of draft email objects, in the order of the input items
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-        try:
-            # Use structured output for type-safe email draft
-            draft = comms_agent.structured_output(EmailDraft, prompt)
-
-            draft_data = draft.model_dump()
-            draft_data["audience"] = audience
-            draft_data["project_id"] = project_id
-            draft_data["planned_comm_id"] = planned_comm_id or planned_comm.get(
-                "target_date"
+    async def _drafts_for(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await agenerate_email_draft(
+                item["project_id"], planned_comm=item["planned_comm"]
             )
-            draft_data["type"] = planned_comm["type"]
-            draft_data["draft_id"] = str(uuid.uuid4())
 
-            drafts.append(draft_data)
+    results = await asyncio.gather(
+        *(_drafts_for(item) for item in items), return_exceptions=True
+    )
 
-        except Exception as e:
-            print(f"Error generating draft for {audience}: {e}")
-            # Fallback draft
-            drafts.append(_generate_fallback_draft(project, audience, planned_comm))
+    drafts = []
+    for item, result in zip(items, results):
+        if isinstance(result, Exception):
+            # One failed communication should not sink the whole batch
+            print(f"Error generating drafts for {item.get('project_id')}: {result}")
+            continue
+        drafts.extend(result)
 
     return drafts
 
 
+async def aprocess_due(
+    max_concurrency: int = BATCH_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Generate email drafts for every communication due within the next 7 days.
+
+    Args:
+        max_concurrency: Maximum number of communications drafted at once
+
+    Returns:
+        Flat list of draft email objects, most urgent communication first
+    """
+    return await agenerate_drafts(get_due_communications(), max_concurrency)
+
+
 def update_comms_history(project_id: str, comm_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update project communications history after sending.
@@ -421,89 +1596,117 @@ def update_comms_history(project_id: str, comm_data: Dict[str, Any]) -> Dict[str
     Returns:
         Success confirmation
     """
-    data = load_projects()
-
-    for project in data["projects"]:
-        if project["id"] == project_id:
-            # Add to comms history
-            comm_entry = {
-                "id": comm_data.get("id", f"comm_{str(uuid.uuid4())[:8]}"),
-                "date_sent": comm_data.get(
-                    "date_sent", datetime.now().strftime("%Y-%m-%d")
-                ),
-                "type": comm_data.get("type"),
-                "audience": comm_data.get("audience"),
-                "subject": comm_data.get("subject"),
-                "summary": comm_data.get("summary", ""),
-                "key_messages": comm_data.get("key_messages", []),
-                "sent_to": comm_data.get("sent_to", []),
-            }
+    data, projects_by_id = _load_projects_indexed()
 
-            if "comms_history" not in project:
-                project["comms_history"] = []
-
-            project["comms_history"].append(comm_entry)
-
-            # Update corresponding planned communication status
-            target_date = comm_data.get("planned_comm_id")
-            if target_date:
-                for comm in project.get("comms_plan", {}).get(
-                    "planned_communications", []
-                ):
-                    if comm.get("target_date") == target_date and comm_data.get(
-                        "audience"
-                    ) in comm.get("audiences", []):
-                        comm["status"] = "sent"
-
-            save_projects(data)
-            return {
-                "success": True,
-                "message": f"Communication added to history for project {project['name']}",
-            }
+    project = projects_by_id.get(project_id)
+    if not project:
+        return {"success": False, "error": "Project not found"}
+
+    # Add to comms history
+    comm_entry = {
+        "id": comm_data.get("id") or f"comm_{token_hex(4)}",
+        "date_sent": comm_data.get("date_sent", date.today().isoformat()),
+        "type": comm_data.get("type"),
+        "audience": comm_data.get("audience"),
+        "subject": comm_data.get("subject"),
+        "summary": comm_data.get("summary", ""),
+        "key_messages": comm_data.get("key_messages", []),
+        "sent_to": comm_data.get("sent_to", []),
+    }
+
+    if "comms_history" not in project:
+        project["comms_history"] = []
+
+    project["comms_history"].append(comm_entry)
+    project["last_comm_date"] = comm_entry["date_sent"]
 
-    return {"success": False, "error": "Project not found"}
+    # Update corresponding planned communication status
+    target_date = comm_data.get("planned_comm_id")
+    if target_date:
+        for comm in project.get("comms_plan", {}).get("planned_communications", []):
+            if comm.get("target_date") == target_date and comm_data.get(
+                "audience"
+            ) in comm.get("audiences", []):
+                comm["status"] = "sent"
+
+    _mark_dirty(data)
+    return {
+        "success": True,
+        "message": f"Communication added to history for project {project['name']}",
+    }
+
+
+async def aupdate_comms_history(
+    project_id: str, comm_data: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Update project communications history after sending, without blocking
+    the event loop if the project data has to be read from disk.
+
+    Args:
+        project_id: The project identifier
+        comm_data: Communication details to add to history
+
+    Returns:
+        Success confirmation
+    """
+    return await asyncio.to_thread(update_comms_history, project_id, comm_data)
 
 
 # Helper functions
 
 
+def _mk_planned(
+    target_date: date,
+    type_: str,
+    audiences: List[str],
+    reason: str,
+    topics: Tuple[str, ...],
+) -> Dict[str, Any]:
+    """Build a pending planned communication entry"""
+    return {
+        "target_date": target_date.isoformat(),
+        "type": type_,
+        "audiences": audiences,
+        "reason": reason,
+        "key_topics": list(topics),
+        "status": "pending",
+    }
+
+
 def _generate_fallback_plan(project: Dict[str, Any]) -> Dict[str, Any]:
     """Generate a basic fallback communications plan"""
-    today = datetime.now()
+    today = date.today()
     planned = []
 
     # Generate basic plan based on project status
     if project["status"] == "active":
         # Weekly status updates for next 3 months
-        for week in range(2, 13, 3):
-            date = (today + timedelta(weeks=week)).strftime("%Y-%m-%d")
+        for week in (2, 5, 8, 11):
             planned.append(
-                {
-                    "target_date": date,
-                    "type": "status_update",
-                    "audiences": ["developers"],
-                    "reason": f"Regular status update - week {week}",
-                    "key_topics": ["Progress update", "Blockers", "Next steps"],
-                    "status": "pending",
-                }
+                _mk_planned(
+                    today + timedelta(weeks=week),
+                    "status_update",
+                    ["developers"],
+                    f"Regular status update - week {week}",
+                    _STATUS_UPDATE_TOPICS,
+                )
             )
 
         # Monthly management updates
-        for month in [1, 2, 3]:
-            date = (today + timedelta(days=30 * month)).strftime("%Y-%m-%d")
+        for month in (1, 2, 3):
             planned.append(
-                {
-                    "target_date": date,
-                    "type": "management_update",
-                    "audiences": ["management"],
-                    "reason": f"Monthly executive update",
-                    "key_topics": ["Progress", "Budget", "Risks", "Timeline"],
-                    "status": "pending",
-                }
+                _mk_planned(
+                    today + timedelta(days=30 * month),
+                    "management_update",
+                    ["management"],
+                    "Monthly executive update",
+                    _MANAGEMENT_UPDATE_TOPICS,
+                )
             )
 
     return {
-        "generated_date": today.strftime("%Y-%m-%d"),
+        "generated_date": today.isoformat(),
         "planning_horizon": "3 months",
         "planned_communications": planned,
     }
@@ -513,62 +1716,35 @@ def _generate_fallback_draft(
     project: Dict[str, Any], audience: str, planned_comm: Dict[str, Any]
 ) -> Dict[str, Any]:
     """Generate a basic fallback email draft"""
-    subject_templates = {
-        "users": f"{project['name']} Update - New Features & Improvements",
-        "developers": f"{project['name']} - Technical Update",
-        "management": f"{project['name']} Status Report",
-    }
-
-    body_templates = {
-        "users": f"""
-Hi team,
-
-We wanted to share an update on {project['name']}.
-
-Recent progress:
-{chr(10).join('- ' + update for update in project['recent_updates'][:3])}
-
-What's coming next:
-We're working on {project['current_phase']} and expect to launch on {project['expected_launch']}.
-
-Thanks for your continued support!
-        """,
-        "developers": f"""
-Team,
-
-Technical update on {project['name']}:
-
-Current Phase: {project['current_phase']}
-
-Recent Updates:
-{chr(10).join('- ' + update for update in project['recent_updates'][:3])}
-
-Upcoming Milestones:
-{chr(10).join(f"- {m['date']}: {m['description']}" for m in project['upcoming_milestones'][:2])}
-
-Please review and let me know if you have questions.
-        """,
-        "management": f"""
-Executive Update: {project['name']}
-
-Status: {project['status']}
-Current Phase: {project['current_phase']}
-Expected Launch: {project['expected_launch']}
-
-Key Accomplishments:
-{chr(10).join('- ' + update for update in project['recent_updates'][:3])}
-
-Business Value: {project['business_value']}
-
-Next Steps:
-{chr(10).join(f"- {m['description']}" for m in project['upcoming_milestones'][:2])}
-        """,
-    }
+    name = project["name"]
+    template = FALLBACK_BODY_TEMPLATES.get(audience)
+    if template:
+        body = template.format(
+            name=name,
+            status=project["status"],
+            current_phase=project["current_phase"],
+            expected_launch=project["expected_launch"],
+            business_value=project["business_value"],
+            recent_updates=_NL.join(
+                "- " + update for update in project["recent_updates"][:3]
+            ),
+            milestones=_NL.join(
+                f"- {m['date']}: {m['description']}"
+                for m in project["upcoming_milestones"][:2]
+            ),
+            next_steps=_NL.join(
+                f"- {m['description']}" for m in project["upcoming_milestones"][:2]
+            ),
+        )
+    else:
+        body = f"Update on {name}"
+
+    subject = FALLBACK_SUBJECT_TEMPLATES.get(audience, "{name} Update")
 
     return {
-        "subject": subject_templates.get(audience, f"{project['name']} Update"),
-        "body": body_templates.get(audience, f"Update on {project['name']}").strip(),
+        "subject": subject.format(name=name),
+        "body": body.strip(),
         "key_points": planned_comm.get("key_topics", []),
         "audience": audience,
-        "draft_id": str(uuid.uuid4()),
+        "draft_id": _new_id(),
     }
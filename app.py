@@ -2,20 +2,82 @@
 Flask application for AI Team Communications Agent
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import (
+    Flask,
+    Response,
+    abort,
+    render_template,
+    request,
+    jsonify,
+    redirect,
+    url_for,
+)
+from flask.json.provider import JSONProvider
+from jinja2 import FileSystemBytecodeCache
+import asyncio
+import hashlib
 import json
 import os
-import uuid
-from datetime import datetime
+import sys
+from secrets import token_hex
+from datetime import date
+
+try:
+    import orjson
+except ImportError:  # fall back to Flask's JSON encoder
+    orjson = None
 
 # Import agent functions
 import agent
 
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that uses orjson for jsonify and request.json"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the str round trip, since the response body is bytes anyway
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_SORT_KEYS),
+            mimetype="application/json",
+        )
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 app.config["SECRET_KEY"] = "dev-secret-key-change-in-production"
+# Keep compiled templates on disk so restarted workers skip parsing them.
+# The default directory is private to the current user.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "data", "projects.json")
 
+# Project fields that the edit form sets directly from its values
+EDITABLE_FIELDS = (
+    "name",
+    "owner",
+    "status",
+    "description",
+    "business_value",
+    "current_phase",
+    "expected_launch",
+)
+
+# Stakeholder audiences, mapped to interned copies so that audience names
+# taken from requests hit the stakeholders dicts by identity; look names up
+# with AUDIENCES.get(name, name) so that any other audience is kept as sent
+AUDIENCES = {
+    sys.intern(audience): sys.intern(audience)
+    for audience in ("users", "developers", "management")
+}
+
 
 # Helper functions
 
@@ -26,8 +88,10 @@ def load_projects():
 
 
 def save_projects(data):
-    """Save projects to JSON file"""
-    agent.save_projects(data)
+    """Save projects to JSON file in the background"""
+    # The in-memory cache already holds the change, so the response
+    # needn't wait for the file write
+    agent.save_projects(data, defer=True)
 
 
 def get_project_by_id(project_id):
@@ -35,6 +99,90 @@ def get_project_by_id(project_id):
     return agent.get_project_by_id(project_id)
 
 
+def split_clean(text, sep):
+    """Split text on sep, dropping surrounding whitespace and empty items"""
+    return [item for item in (part.strip() for part in text.split(sep)) if item]
+
+
+def parse_emails(form, audience):
+    """
+    One audience's stakeholder emails from the form.
+
+    The field may be sent once with comma-separated emails (as the project
+    forms do) or repeated with one or more emails per value.
+    """
+    return [
+        email for value in form.getlist(audience) for email in split_clean(value, ",")
+    ]
+
+
+def parse_stakeholders(form):
+    """Stakeholder email lists from the form"""
+    return {audience: parse_emails(form, audience) for audience in AUDIENCES}
+
+
+def parse_milestones(text):
+    """Milestones from "date: description" lines, skipping lines without a colon"""
+    milestones = []
+    for line in text.split("\n"):
+        milestone_date, sep, milestone_desc = line.partition(":")
+        if sep:
+            milestones.append(
+                {"date": milestone_date.strip(), "description": milestone_desc.strip()}
+            )
+    return milestones
+
+
+def encode_json(data):
+    """Encode data as JSON bytes, with orjson when it is installed"""
+    # Sorted keys match what jsonify returns
+    if orjson is None:
+        return app.json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+
+def json_response(data, status=200):
+    """JSON response for the API"""
+    return Response(encode_json(data), status=status, mimetype="application/json")
+
+
+# project_id (None for all projects) -> (data version, JSON bytes, ETag)
+_encoded_projects = {}
+
+
+def encoded_projects(project_id, version):
+    """
+    JSON bytes and ETag for all projects (project_id None) or one project.
+
+    Only the encoding for the latest data version is kept for each
+    project_id, so the bytes are re-encoded once after the projects change
+    and superseded encodings don't pile up.
+    """
+    cached = _encoded_projects.get(project_id)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+
+    data = load_projects() if project_id is None else get_project_by_id(project_id)
+    if data is None:
+        # Not cached, so requests for unknown ids can't grow the dict
+        return None, None
+    body = encode_json(data)
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    _encoded_projects[project_id] = (version, body, etag)
+    return body, etag
+
+
+def cached_projects_response(project_id=None):
+    """Serve encoded_projects, answering 304 when the client's ETag matches"""
+    body, etag = encoded_projects(project_id, agent.data_version())
+    if body is None:
+        return json_response({"error": "Project not found"}, 404)
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
 # Routes
 
 
@@ -42,17 +190,9 @@ def get_project_by_id(project_id):
 def index():
     """Dashboard: Display all projects"""
     data = load_projects()
-    projects = data.get("projects", [])
-
-    # Add last communication date to each project
-    for project in projects:
-        comms_history = project.get("comms_history", [])
-        if comms_history:
-            project["last_comm_date"] = comms_history[-1].get("date_sent", "N/A")
-        else:
-            project["last_comm_date"] = "No communications yet"
 
-    return render_template("index.html", projects=projects)
+    # Each project stores its last_comm_date, kept up to date by the agent
+    return render_template("index.html", projects=data.get("projects", []))
 
 
 @app.route("/project/<project_id>")
@@ -76,41 +216,20 @@ def create_project():
     data = load_projects()
 
     new_project = {
-        "id": f"proj_{str(uuid.uuid4())[:8]}",
+        "id": f"proj_{token_hex(4)}",
         "name": request.form.get("name", ""),
         "owner": request.form.get("owner", ""),
         "status": request.form.get("status", "planning"),
         "description": request.form.get("description", ""),
         "business_value": request.form.get("business_value", ""),
-        "start_date": request.form.get(
-            "start_date", datetime.now().strftime("%Y-%m-%d")
-        ),
+        "start_date": request.form.get("start_date", date.today().isoformat()),
         "current_phase": request.form.get("current_phase", ""),
         "expected_launch": request.form.get("expected_launch", ""),
-        "stakeholders": {
-            "users": [
-                email.strip()
-                for email in request.form.get("users", "").split(",")
-                if email.strip()
-            ],
-            "developers": [
-                email.strip()
-                for email in request.form.get("developers", "").split(",")
-                if email.strip()
-            ],
-            "management": [
-                email.strip()
-                for email in request.form.get("management", "").split(",")
-                if email.strip()
-            ],
-        },
-        "recent_updates": [
-            update.strip()
-            for update in request.form.get("recent_updates", "").split("\n")
-            if update.strip()
-        ],
-        "upcoming_milestones": [],
+        "stakeholders": parse_stakeholders(request.form),
+        "recent_updates": split_clean(request.form.get("recent_updates", ""), "\n"),
+        "upcoming_milestones": parse_milestones(request.form.get("milestones", "")),
         "comms_history": [],
+        "last_comm_date": None,
         "comms_plan": {
             "generated_date": None,
             "planning_horizon": None,
@@ -118,18 +237,6 @@ def create_project():
         },
     }
 
-    # Parse milestones if provided
-    milestones_data = request.form.get("milestones", "")
-    if milestones_data:
-        for line in milestones_data.split("\n"):
-            if ":" in line:
-                parts = line.split(":", 1)
-                milestone_date = parts[0].strip()
-                milestone_desc = parts[1].strip()
-                new_project["upcoming_milestones"].append(
-                    {"date": milestone_date, "description": milestone_desc}
-                )
-
     data["projects"].append(new_project)
     save_projects(data)
 
@@ -139,68 +246,35 @@ def create_project():
 @app.route("/project/<project_id>/edit", methods=["POST"])
 def edit_project(project_id):
     """Update project details"""
-    data = load_projects()
-
-    for project in data["projects"]:
-        if project["id"] == project_id:
-            # Update fields
-            project["name"] = request.form.get("name", project["name"])
-            project["owner"] = request.form.get("owner", project["owner"])
-            project["status"] = request.form.get("status", project["status"])
-            project["description"] = request.form.get(
-                "description", project["description"]
-            )
-            project["business_value"] = request.form.get(
-                "business_value", project["business_value"]
-            )
-            project["current_phase"] = request.form.get(
-                "current_phase", project["current_phase"]
-            )
-            project["expected_launch"] = request.form.get(
-                "expected_launch", project["expected_launch"]
-            )
-
-            # Update stakeholders
-            project["stakeholders"] = {
-                "users": [
-                    email.strip()
-                    for email in request.form.get("users", "").split(",")
-                    if email.strip()
-                ],
-                "developers": [
-                    email.strip()
-                    for email in request.form.get("developers", "").split(",")
-                    if email.strip()
-                ],
-                "management": [
-                    email.strip()
-                    for email in request.form.get("management", "").split(",")
-                    if email.strip()
-                ],
-            }
+    data, project = agent.get_project_for_update(project_id)
+    if project is None:
+        abort(404)
+
+    form = request.form
+
+    # Update the fields that were submitted
+    for field in EDITABLE_FIELDS:
+        value = form.get(field)
+        if value is not None:
+            project[field] = value
+
+    # Update the stakeholder lists that were submitted
+    stakeholders = project.setdefault("stakeholders", {})
+    for audience in AUDIENCES:
+        if audience in form:
+            stakeholders[audience] = parse_emails(form, audience)
+
+    # Update recent updates
+    updates_text = form.get("recent_updates", "")
+    if updates_text:
+        project["recent_updates"] = split_clean(updates_text, "\n")
+
+    # Update milestones
+    milestones_data = form.get("milestones", "")
+    if milestones_data:
+        project["upcoming_milestones"] = parse_milestones(milestones_data)
 
-            # Update recent updates
-            updates_text = request.form.get("recent_updates", "")
-            if updates_text:
-                project["recent_updates"] = [
-                    u.strip() for u in updates_text.split("\n") if u.strip()
-                ]
-
-            # Update milestones
-            milestones_data = request.form.get("milestones", "")
-            if milestones_data:
-                project["upcoming_milestones"] = []
-                for line in milestones_data.split("\n"):
-                    if ":" in line:
-                        parts = line.split(":", 1)
-                        milestone_date = parts[0].strip()
-                        milestone_desc = parts[1].strip()
-                        project["upcoming_milestones"].append(
-                            {"date": milestone_date, "description": milestone_desc}
-                        )
-
-            save_projects(data)
-            break
+    save_projects(data)
 
     return redirect(url_for("project_detail", project_id=project_id))
 
@@ -255,23 +329,14 @@ def generate_drafts():
     """Generate email drafts for planned communications"""
     try:
         # Get selected communications from request
-        selected = request.json.get("communications", [])
-
-        all_drafts = []
+        selected = [
+            comm_item
+            for comm_item in request.json.get("communications", [])
+            if comm_item.get("project_id") and comm_item.get("planned_comm")
+        ]
 
-        for comm_item in selected:
-            project_id = comm_item.get("project_id")
-            planned_comm = comm_item.get("planned_comm")
-
-            if not project_id or not planned_comm:
-                continue
-
-            # Generate drafts for this communication
-            drafts = agent.generate_email_draft(
-                project_id=project_id, planned_comm=planned_comm
-            )
-
-            all_drafts.extend(drafts)
+        # Generate drafts for all selected communications concurrently
+        all_drafts = asyncio.run(agent.agenerate_drafts(selected))
 
         return jsonify(
             {
@@ -301,6 +366,8 @@ def send_email():
 
         project_id = draft_data.get("project_id")
         audience = draft_data.get("audience")
+        # Other audience names (plans are free to use them) pass through as-is
+        audience = AUDIENCES.get(audience, audience)
         subject = draft_data.get("subject")
         body = draft_data.get("body")
         key_points = draft_data.get("key_points", [])
@@ -315,8 +382,8 @@ def send_email():
 
         # Create communication history entry
         comm_data = {
-            "id": f"comm_{str(uuid.uuid4())[:8]}",
-            "date_sent": datetime.now().strftime("%Y-%m-%d"),
+            "id": f"comm_{token_hex(4)}",
+            "date_sent": date.today().isoformat(),
             "type": draft_data.get("type", "status_update"),
             "audience": audience,
             "subject": subject,
@@ -349,25 +416,16 @@ def send_email():
 def add_manual_communication(project_id):
     """Add a manual communication to project history"""
     try:
+        audience = request.form.get("audience", "users")
         comm_data = {
-            "id": f"comm_{str(uuid.uuid4())[:8]}",
-            "date_sent": request.form.get(
-                "date_sent", datetime.now().strftime("%Y-%m-%d")
-            ),
+            "id": f"comm_{token_hex(4)}",
+            "date_sent": request.form.get("date_sent", date.today().isoformat()),
             "type": request.form.get("type", "status_update"),
-            "audience": request.form.get("audience", "users"),
+            "audience": AUDIENCES.get(audience, audience),
             "subject": request.form.get("subject", ""),
             "summary": request.form.get("summary", ""),
-            "key_messages": [
-                msg.strip()
-                for msg in request.form.get("key_messages", "").split("\n")
-                if msg.strip()
-            ],
-            "sent_to": [
-                email.strip()
-                for email in request.form.get("sent_to", "").split(",")
-                if email.strip()
-            ],
+            "key_messages": split_clean(request.form.get("key_messages", ""), "\n"),
+            "sent_to": split_clean(request.form.get("sent_to", ""), ","),
         }
 
         result = agent.update_comms_history(project_id, comm_data)
@@ -384,18 +442,13 @@ def add_manual_communication(project_id):
 @app.route("/api/projects")
 def api_projects():
     """API endpoint to get all projects"""
-    data = load_projects()
-    return jsonify(data)
+    return cached_projects_response()
 
 
 @app.route("/api/project/<project_id>")
 def api_project(project_id):
     """API endpoint to get single project"""
-    project = get_project_by_id(project_id)
-    if project:
-        return jsonify(project)
-    else:
-        return jsonify({"error": "Project not found"}), 404
+    return cached_projects_response(project_id)
 
 
 # Error handlers
@@ -418,4 +471,6 @@ if __name__ == "__main__":
     # Run the app
     print("Starting AI Team Communications Agent...")
     print("Access at: http://localhost:5000")
-    app.run(debug=True, host="0.0.0.0", port=5001)
+    # Debug mode (reloader, debugger, template auto-reload) is opt-in via
+    # FLASK_DEBUG=1; without it templates are compiled once and cached
+    app.run(host="0.0.0.0", port=5001)
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for running the app under a production server, e.g.
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5001 wsgi:application
+
+Use a single worker process: projects are stored in one JSON file, and
+each process keeps its own copy of the data and of unflushed changes.
+"""
+
+from app import app as application